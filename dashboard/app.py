@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
 import sys
 from io import BytesIO
@@ -12,8 +11,85 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, project_root)
 
+from src.categoricals import CATEGORICAL_COLUMNS, to_categoricals
 from src.forecast_usage_and_access import ForecastAccessAndUsage
 
+DATA_DIR = os.path.join(project_root, "data", "processed")
+DATA_FILE = os.path.join(DATA_DIR, "ethiopia_fi_unified_data.xlsx")
+MAIN_PARQUET = os.path.join(DATA_DIR, "ethiopia_fi_unified_data.parquet")
+IMPACT_PARQUET = os.path.join(DATA_DIR, "impact.parquet")
+
+# Columns of the main sheet the dashboard (and the forecast model) reads
+OBS_COLUMNS = ["record_id", "record_type", "indicator_code", "observation_date", "value_numeric", "gender"]
+
+
+def frame_fingerprint(df):
+    """Cheap cache key for a DataFrame: its shape plus a vectorised content hash."""
+    return df.shape, int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+@st.cache_resource(max_entries=2, hash_funcs={pd.DataFrame: frame_fingerprint})
+def _get_model(obs, events, links, indicators):
+    """One forecast model per server and data version, shared across reruns."""
+    return ForecastAccessAndUsage(
+        observations_df=obs,
+        events_df=events,
+        impact_links_df=links,
+        indicators_metadata=indicators
+    )
+
+
+@st.cache_data(ttl="1h", max_entries=32, hash_funcs={pd.DataFrame: frame_fingerprint})
+def _cached_scenarios(indicator, obs, events, links, _model):
+    """Scenario forecasts for one indicator, refitted only when the data changes."""
+    return _model.generate_scenarios(indicator)
+
+
+@st.cache_data(max_entries=4, hash_funcs={pd.DataFrame: frame_fingerprint})
+def _build_csv_bytes(df):
+    """CSV export of a dataset, serialised once per data version."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    # Arrow's multi-threaded writer; it can't write dictionary-encoded
+    # columns, so categoricals go out as plain strings
+    categorical = df.select_dtypes(include="category").columns
+    table = pa.Table.from_pandas(df.astype(dict.fromkeys(categorical, "string")), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+@st.cache_data(max_entries=4, hash_funcs={pd.DataFrame: frame_fingerprint})
+def _build_xlsx_bytes(df, sheet_name):
+    """Excel export of a dataset, serialised once per data version."""
+    # xlsxwriter's constant_memory mode is not usable here: pandas writes
+    # cells column by column, and constant_memory drops every row but the last
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=64, ttl="10m", show_spinner=False)
+def build_and_cache_fig(key, _df, xaxes=None, hline=None, **px_kwargs):
+    """
+    Build a px.line figure, cached by ``key``.
+
+    ``key`` must identify what is plotted (page, indicator, range, scenario
+    and data version); the frame itself is not hashed. The figure is
+    returned as is, since st.plotly_chart serialises it itself.
+    """
+    # Deferred until the first uncached figure; plotly.express is slow to import
+    import plotly.express as px
+
+    fig = px.line(_df, **px_kwargs)
+    if xaxes:
+        fig.update_xaxes(**xaxes)
+    if hline:
+        fig.add_hline(**hline)
+    return fig
+
 
 class Dashboard:
     """Ethiopia Financial Inclusion Dashboard"""
@@ -24,199 +100,296 @@ class Dashboard:
             layout="wide"
         )
 
-        self.obs, self.events, self.impact_links = self.load_data()
+        # Loaded data is kept in session_state, so reruns within a session
+        # skip even the copy st.cache_data hands back from load_data
+        self.data_mtime = os.path.getmtime(DATA_FILE)
+        if st.session_state.get("data_mtime") != self.data_mtime:
+            st.session_state.data = self.load_data(self.data_mtime, DATA_FILE)
+            st.session_state.data_mtime = self.data_mtime
+            st.session_state.forecast_model = None
+        st.session_state.setdefault("forecast_model", None)
+
+        (
+            self.obs, self.obs_by_code, self.events, self.impact_links,
+            self.latest_values, self.totals
+        ) = st.session_state.data
         self.indicators = {
             "ACC_OWNERSHIP": {"name": "Account Ownership (%)", "unit": "% Adults"},
             "DIG_PAY": {"name": "Digital Payment Usage (%)", "unit": "% Adults"},
         }
-        self.forecast_model = ForecastAccessAndUsage(
-            observations_df=self.obs,
-            events_df=self.events,
-            impact_links_df=self.impact_links,
-            indicators_metadata=self.indicators
-        )
 
-        # Sidebar navigation
-        self.page = st.sidebar.radio(
+        # Sidebar navigation, stored in st.session_state.page
+        st.sidebar.radio(
             "📌 Dashboard Navigation",
-            ["Overview", "Trends", "Forecasts", "Inclusion Projections", "Download Data"]
+            ["Overview", "Trends", "Forecasts", "Inclusion Projections", "Download Data"],
+            key="page"
         )
 
         # Route page
         self.route_page()
 
     @staticmethod
-    @st.cache_data
-    def load_data():
-        """Load datasets from Excel"""
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-        file_path = os.path.join(project_root, "data", "processed", "ethiopia_fi_unified_data.xlsx")
+    # No ttl: Streamlit ignores it for disk-persisted caches
+    @st.cache_data(persist="disk", max_entries=2, show_spinner=False)
+    def load_data(file_mtime: float, path: str):
+        """
+        Load datasets, preferring the Parquet copies of the Excel workbook.
+
+        ``file_mtime`` is only part of the cache key, so a refreshed
+        workbook invalidates the persisted entry.
+        """
+        if not (Dashboard.is_fresh(MAIN_PARQUET, path) and Dashboard.is_fresh(IMPACT_PARQUET, path)):
+            Dashboard.convert_to_parquet(path)
+
+        main_df = pd.read_parquet(MAIN_PARQUET, engine="pyarrow", columns=OBS_COLUMNS)
+        impact_df = pd.read_parquet(IMPACT_PARQUET, engine="pyarrow")
+
+        main_df = to_categoricals(main_df)
+
+        # observation_date is stored as a Parquet timestamp, no parsing needed
+        observations = main_df[main_df["record_type"] == "observation"]
+        events = main_df[main_df["record_type"] == "event"]
+
+        # Keep only gender=all for aggregated metrics, sorted once by date
+        observations_all = observations[observations["gender"] == "all"].sort_values("observation_date")
+
+        # Per-indicator slices indexed by a sorted DatetimeIndex, built once
+        obs_by_code = {
+            code: group.set_index("observation_date")
+            for code, group in observations_all.groupby("indicator_code", sort=False, observed=True)
+        }
+
+        # Latest value and total per indicator, read directly by the Overview page
+        summary = observations_all.groupby("indicator_code", sort=False, observed=True)["value_numeric"].agg(
+            ["last", "sum"]
+        )
+        latest_values = summary["last"]
+        totals = summary["sum"]
 
-        main_df = pd.read_excel(file_path)
-        impact_df = pd.read_excel(file_path, sheet_name="Impact_sheet")
+        return observations_all, obs_by_code, events, impact_df, latest_values, totals
+
+    @staticmethod
+    @st.cache_data(max_entries=2, show_spinner=False)
+    def load_export_observations(file_mtime: float, path: str):
+        """
+        Every column of the gender=all observation rows, read only when the
+        Download page renders; load_data keeps just the charted columns.
+        """
+        if not Dashboard.is_fresh(MAIN_PARQUET, path):
+            Dashboard.convert_to_parquet(path)
+
+        main_df = pd.read_parquet(MAIN_PARQUET, engine="pyarrow")
+        return main_df[(main_df["record_type"] == "observation") & (main_df["gender"] == "all")]
 
-        observations = main_df[main_df["record_type"] == "observation"].copy()
-        events = main_df[main_df["record_type"] == "event"].copy()
+    @staticmethod
+    def is_fresh(parquet_path, source_path):
+        """True when the Parquet copy exists and is not older than its source."""
+        return (
+            os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= os.path.getmtime(source_path)
+        )
+
+    @staticmethod
+    def convert_to_parquet(path):
+        """One-time conversion of both workbook sheets to zstd-compressed Parquet."""
+        dtypes = {col: "category" for col in CATEGORICAL_COLUMNS if col in OBS_COLUMNS}
 
-        observations["observation_date"] = pd.to_datetime(observations["observation_date"])
-        events["observation_date"] = pd.to_datetime(events["observation_date"])
+        # Both sheets are parsed from a single open workbook. Every column
+        # is kept; readers select the ones they need from the Parquet file
+        with pd.ExcelFile(path, engine="openpyxl") as xls:
+            main_df = pd.read_excel(xls, sheet_name=0, dtype=dtypes, parse_dates=["observation_date"])
+            impact_df = pd.read_excel(xls, sheet_name="Impact_sheet")
 
-        # Keep only gender=all for aggregated metrics
-        observations_all = observations[observations["gender"] == "all"].copy()
+        for df, target in [(main_df, MAIN_PARQUET), (impact_df, IMPACT_PARQUET)]:
+            # Excel columns mixing numbers and text can't be written by pyarrow
+            mixed = df.select_dtypes(include="object").columns
+            df[mixed] = df[mixed].astype("string")
 
-        return observations_all, events, impact_df
+            df.to_parquet(target, engine="pyarrow", compression="zstd", index=False)
+
+    @staticmethod
+    @st.cache_data(show_spinner=False)
+    def year_bounds(indicator, file_mtime, _df):
+        """First and last observation year of an indicator's date-indexed slice."""
+        return int(_df.index[0].year), int(_df.index[-1].year)
+
+    def get_forecast_model(self):
+        """Forecast model for the loaded data, built on first use in a session."""
+        if st.session_state.forecast_model is None:
+            st.session_state.forecast_model = _get_model(
+                self.obs, self.events, self.impact_links, self.indicators
+            )
+        return st.session_state.forecast_model
 
     def route_page(self):
-        if self.page == "Overview":
+        page = st.session_state.page
+        if page == "Overview":
             self.page_overview()
-        elif self.page == "Trends":
+        elif page == "Trends":
             self.page_trends()
-        elif self.page == "Forecasts":
+        elif page == "Forecasts":
             self.page_forecasts()
-        elif self.page == "Inclusion Projections":
+        elif page == "Inclusion Projections":
             self.page_inclusion()
-        elif self.page == "Download Data":
+        elif page == "Download Data":
             self.page_download()
 
     # =======================================================
     # Overview Page
     # =======================================================
+    @st.fragment
     def page_overview(self):
         st.title("🇪🇹 Ethiopia Financial Inclusion Overview")
 
         # Latest value per indicator
-        latest_values = {}
-        for code in self.indicators.keys():
-            df_ind = self.obs[self.obs["indicator_code"] == code]
-            if df_ind.empty:
-                latest_values[code] = None
-            else:
-                latest_row = df_ind.loc[df_ind["observation_date"].idxmax()]
-                latest_values[code] = latest_row["value_numeric"]
+        acc_latest = self.latest_values.get("ACC_OWNERSHIP")
+        dig_latest = self.latest_values.get("DIG_PAY")
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Account Ownership (%)",
-                    f"{latest_values['ACC_OWNERSHIP']:.1f}" if latest_values['ACC_OWNERSHIP'] else "No data")
+                    f"{acc_latest:.1f}" if acc_latest else "No data")
         col2.metric("Digital Payment Usage (%)",
-                    f"{latest_values['DIG_PAY']:.1f}" if latest_values['DIG_PAY'] else "No data")
+                    f"{dig_latest:.1f}" if dig_latest else "No data")
 
         # P2P / ATM Crossover Ratio
-        df_p2p = self.obs[self.obs["indicator_code"] == "USG_P2P_VALUE"]
-        df_atm = self.obs[self.obs["indicator_code"] == "USG_ATM_VALUE"]
-        p2p_sum = df_p2p["value_numeric"].sum() if not df_p2p.empty else 0
-        atm_sum = df_atm["value_numeric"].sum() if not df_atm.empty else 0
+        p2p_sum = self.totals.get("USG_P2P_VALUE", 0)
+        atm_sum = self.totals.get("USG_ATM_VALUE", 0)
         crossover_ratio = p2p_sum / atm_sum if atm_sum != 0 else 0
         col3.metric("P2P / ATM Crossover Ratio", f"{crossover_ratio:.2f}")
 
         st.divider()
         st.subheader("📈 Trends Over Time")
 
-        df_plot = self.obs[self.obs["indicator_code"].isin(["ACC_OWNERSHIP", "DIG_PAY"])]
-        fig = px.line(df_plot, x="observation_date", y="value_numeric",
-                      color="indicator_code", markers=True,
-                      title="Account Ownership vs Digital Payment Usage (Gender=All)")
-        fig.update_xaxes(dtick="M12", tickformat="%Y")  # Only integer years
+        slices = [self.obs_by_code[code] for code in ["ACC_OWNERSHIP", "DIG_PAY"] if code in self.obs_by_code]
+        if not slices:
+            st.info("No observations available for Account Ownership or Digital Payment Usage.")
+            return
+
+        df_plot = pd.concat(slices).reset_index()
+        fig = build_and_cache_fig(("overview", self.data_mtime), df_plot,
+                                  xaxes={"dtick": "M12", "tickformat": "%Y"},  # Only integer years
+                                  x="observation_date", y="value_numeric",
+                                  color="indicator_code", markers=True, render_mode="webgl",
+                                  title="Account Ownership vs Digital Payment Usage (Gender=All)")
         st.plotly_chart(fig, use_container_width=True)
 
     # =======================================================
     # Trends Page
     # =======================================================
+    @st.fragment
     def page_trends(self):
         st.title("📊 Historical Trends")
 
         indicator = st.selectbox("Select Indicator", list(self.indicators.keys()))
-        df = self.obs[self.obs["indicator_code"] == indicator].copy()
-        df = df.sort_values("observation_date")
+        df = self.obs_by_code.get(indicator)
+        if df is None:
+            st.info(f"No observations available for {self.indicators[indicator]['name']}.")
+            return
 
+        year_min, year_max = self.year_bounds(indicator, self.data_mtime, df)
         start_year, end_year = st.slider(
             "Select Year Range",
-            int(df["observation_date"].dt.year.min()),
-            int(df["observation_date"].dt.year.max()),
-            (int(df["observation_date"].dt.year.min()), int(df["observation_date"].dt.year.max()))
+            year_min,
+            year_max,
+            (year_min, year_max)
         )
 
-        filtered = df[(df["observation_date"].dt.year >= start_year) &
-                      (df["observation_date"].dt.year <= end_year)]
+        # Year strings slice the sorted DatetimeIndex by binary search and
+        # include every timestamp of the end year
+        filtered = df.loc[str(start_year):str(end_year)].reset_index()
 
-        fig = px.line(filtered, x="observation_date", y="value_numeric", markers=True,
-                      title=f"{self.indicators[indicator]['name']} Trend ({start_year}-{end_year})")
-        fig.update_xaxes(dtick="M12", tickformat="%Y")
+        fig = build_and_cache_fig(("trends", indicator, start_year, end_year, self.data_mtime), filtered,
+                                  xaxes={"dtick": "M12", "tickformat": "%Y"},
+                                  x="observation_date", y="value_numeric", markers=True, render_mode="webgl",
+                                  title=f"{self.indicators[indicator]['name']} Trend ({start_year}-{end_year})")
         st.plotly_chart(fig, use_container_width=True)
 
     # =======================================================
     # Forecasts Page
     # =======================================================
+    @st.fragment
     def page_forecasts(self):
         st.title("🔮 Forecasts (2025–2027)")
 
         indicator = st.selectbox("Forecast Indicator", list(self.indicators.keys()))
         scenario = st.radio("Scenario", ["baseline", "with_events", "optimistic", "pessimistic"])
+        if indicator not in self.obs_by_code:
+            st.info(f"No observations available for {self.indicators[indicator]['name']}.")
+            return
 
-        self.forecast_model.generate_scenarios(indicator)
-        df = self.forecast_model.scenario_forecasts[indicator][scenario]
+        forecast_model = self.get_forecast_model()
+        df = _cached_scenarios(indicator, self.obs, self.events, self.impact_links, forecast_model)[scenario]
 
         y_col = "baseline" if scenario == "baseline" else "forecast"
 
-        fig = px.line(df, x="year", y=y_col, markers=True,
-                      title=f"{self.indicators[indicator]['name']} Forecast ({scenario})")
-        fig.update_xaxes(dtick=1)  # Integer years
+        fig = build_and_cache_fig(("forecast", indicator, scenario, self.data_mtime), df,
+                                  xaxes={"dtick": 1},  # Integer years
+                                  x="year", y=y_col, markers=True,
+                                  title=f"{self.indicators[indicator]['name']} Forecast ({scenario})")
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("📌 Event Contributions")
-        self.forecast_model.explain_contributions(indicator)
+        contributions = forecast_model.explain_contributions(indicator, show=False)
+        if contributions is None:
+            st.info("No event impacts found.")
+        else:
+            st.dataframe(contributions, use_container_width=True)
 
     # =======================================================
     # Inclusion Projections Page
     # =======================================================
+    @st.fragment
     def page_inclusion(self):
         st.title("🎯 Inclusion Projections (2025–2027)")
 
         scenario = st.selectbox("Select Scenario", ["with_events", "optimistic", "pessimistic"])
 
+        forecast_model = self.get_forecast_model()
         for indicator in ["ACC_OWNERSHIP", "DIG_PAY"]:
             st.subheader(f"{self.indicators[indicator]['name']} Projection")
-            self.forecast_model.generate_scenarios(indicator)
-            df = self.forecast_model.scenario_forecasts[indicator][scenario]
+            if indicator not in self.obs_by_code:
+                st.info(f"No observations available for {self.indicators[indicator]['name']}.")
+                continue
 
-            fig = px.line(df, x="year", y="forecast", markers=True,
-                          title=f"{self.indicators[indicator]['name']} Projection ({scenario})")
-            fig.update_xaxes(dtick=1)
-            st.plotly_chart(fig, use_container_width=True)
+            df = _cached_scenarios(indicator, self.obs, self.events, self.impact_links, forecast_model)[scenario]
 
+            # Progress toward the 60% account ownership target
+            target = None
             if indicator == "ACC_OWNERSHIP":
-                st.markdown("### Progress Toward 60% Target")
-                target_df = pd.DataFrame({"year": df["year"], "target": [60] * len(df)})
-                fig2 = px.line(target_df, x="year", y="target", markers=True, title="60% Target")
-                fig2.update_xaxes(dtick=1)
-                st.plotly_chart(fig2, use_container_width=True)
+                target = {"y": 60, "line_dash": "dash", "line_color": "red",
+                          "annotation_text": "60% Target", "annotation_position": "top right"}
+
+            fig = build_and_cache_fig(("inclusion", indicator, scenario, self.data_mtime), df,
+                                      xaxes={"dtick": 1}, hline=target,
+                                      x="year", y="forecast", markers=True, render_mode="webgl",
+                                      title=f"{self.indicators[indicator]['name']} Projection ({scenario})")
+            st.plotly_chart(fig, use_container_width=True)
 
     # =======================================================
     # Download Page
     # =======================================================
+    @st.fragment
     def page_download(self):
-        st.title("⬇️ Download Datasets (Excel)")
-
-        # Observations
-        buffer_obs = BytesIO()
-        with pd.ExcelWriter(buffer_obs, engine="xlsxwriter") as writer:
-            self.obs.to_excel(writer, index=False, sheet_name="observations")
-        st.download_button(
-            "Download Observations (Excel)",
-            data=buffer_obs.getvalue(),
-            file_name="ethiopia_observations.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-
-        # Impact Links
-        buffer_links = BytesIO()
-        with pd.ExcelWriter(buffer_links, engine="xlsxwriter") as writer:
-            self.impact_links.to_excel(writer, index=False, sheet_name="impact_links")
-        st.download_button(
-            "Download Impact Links (Excel)",
-            data=buffer_links.getvalue(),
-            file_name="ethiopia_impact_links.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        st.title("⬇️ Download Datasets")
+
+        for label, df, name in [
+            ("Observations", self.load_export_observations(self.data_mtime, DATA_FILE), "observations"),
+            ("Impact Links", self.impact_links, "impact_links"),
+        ]:
+            st.subheader(label)
+            col_csv, col_xlsx = st.columns(2)
+            col_csv.download_button(
+                f"Download {label} (CSV)",
+                data=_build_csv_bytes(df),
+                file_name=f"ethiopia_{name}.csv",
+                mime="text/csv"
+            )
+            col_xlsx.download_button(
+                f"Download {label} (Excel)",
+                data=_build_xlsx_bytes(df, name),
+                file_name=f"ethiopia_{name}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
 
 # =======================================================
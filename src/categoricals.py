@@ -0,0 +1,29 @@
+import pandas as pd
+
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = (
+    "record_type", "pillar", "gender", "confidence", "indicator_code", "indicator",
+    "source_type", "evidence_basis", "impact_direction", "impact_magnitude",
+    "related_indicator",
+)
+
+
+def to_categoricals(df: pd.DataFrame, lowercase=()) -> pd.DataFrame:
+    """
+    Returns a shallow copy of df with its CATEGORICAL_COLUMNS cast to
+    category. Columns listed in lowercase also get lower-cased categories,
+    whatever text dtype they arrived in. df itself is left untouched.
+    """
+    df = df.copy(deep=False)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            values = df[col].astype("category")
+            if col in lowercase:
+                # Lower-cases the categories rather than every row
+                lowered = {c: c.lower() if isinstance(c, str) else c for c in values.cat.categories}
+                values = values.map(lowered).astype("category")
+            df[col] = values
+
+    return df
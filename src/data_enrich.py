@@ -34,13 +34,25 @@ class DataEnrichment:
             if df.index.name == "record_id":
                 df = df.reset_index()
 
+            # Key rows by record_id (the column is kept) so enrichment can
+            # look up existing records without rescanning the whole frame
+            if "record_id" in df.columns:
+                df = df.set_index("record_id", drop=False).rename_axis(None)
+                # Last occurrence wins for ids already duplicated in df
+                df = df[~df.index.duplicated(keep="last")]
+
             self.df = df
 
-            # Convert observation_date if available
-            if "observation_date" in self.df.columns:
+            # Convert observation_date if it is still unparsed
+            if (
+                "observation_date" in self.df.columns
+                and not pd.api.types.is_datetime64_any_dtype(self.df["observation_date"])
+            ):
                 self.df["observation_date"] = pd.to_datetime(
                     self.df["observation_date"],
-                    errors="coerce"
+                    errors="coerce",
+                    format="ISO8601",
+                    cache=True
                 )
 
             logging.info("DataEnrichment initialized successfully.")
@@ -74,18 +86,29 @@ class DataEnrichment:
             if "record_id" not in new_df.columns:
                 raise KeyError("New records must include a 'record_id' field.")
 
-            # Convert observation_date safely
-            if "observation_date" in new_df.columns:
+            # Convert observation_date safely if still unparsed
+            if (
+                "observation_date" in new_df.columns
+                and not pd.api.types.is_datetime64_any_dtype(new_df["observation_date"])
+            ):
                 new_df["observation_date"] = pd.to_datetime(
                     new_df["observation_date"],
-                    errors="coerce"
+                    errors="coerce",
+                    format="ISO8601",
+                    cache=True
                 )
 
-            # Append new records
-            self.df = pd.concat([self.df, new_df], ignore_index=True)
-
-            # Remove duplicates based on record_id
-            self.df = self.df.drop_duplicates(subset=["record_id"], keep="last")
+            # Last occurrence wins within the batch itself: one dict pass
+            # maps each record_id to the position of its last row
+            last_pos = {rid: pos for pos, rid in enumerate(new_df["record_id"])}
+            if len(last_pos) < len(new_df):
+                new_df = new_df.iloc[sorted(last_pos.values())]
+            new_df = new_df.set_index("record_id", drop=False).rename_axis(None)
+
+            # Replace records whose record_id already exists, append the rest
+            common = new_df.index.intersection(self.df.index)
+            existing = self.df.drop(index=common) if len(common) else self.df
+            self.df = pd.concat([existing, new_df])
 
             # Log success
             print("\n--- Enrichment Success ---")
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from IPython.display import display
+from types import SimpleNamespace
+from .categoricals import to_categoricals
+from .display import display
 from .logging_config import logging
 
 
@@ -32,19 +34,123 @@ class InclusionDataProfiler:
             self.df = df
             self.impact_df = impact_df
 
+            # Summaries cached by _section(), keyed by id(self.df)
+            self._sections = {}
+            self._sections_key = None
+
             # Convert observation_date safely
             if "observation_date" in self.df.columns:
                 self.df["observation_date"] = pd.to_datetime(
                     self.df["observation_date"],
-                    errors="coerce"
+                    errors="coerce",
+                    format="ISO8601",
+                    cache=True
                 )
 
+            # Cast on a shallow copy so the caller's frame keeps its dtypes
+            self.df = to_categoricals(self.df)
+
             logging.info("InclusionDataProfiler initialized successfully.")
 
         except Exception as e:
             logging.error(f"Profiler initialization failed: {e}")
             raise
 
+    # --------------------------------------------------------
+    # 0. Cached Summaries
+    # --------------------------------------------------------
+    def _section(self, name):
+        """
+        Returns one profiling summary, computed on first use and cached
+        until self.df is replaced. Each summary is built on its own, so a
+        failure in one does not affect the others.
+        """
+
+        if self._sections_key != id(self.df):
+            self._sections = {}
+            self._sections_key = id(self.df)
+
+        if name not in self._sections:
+            self._sections[name] = getattr(self, f"_build_{name}")()
+
+        return self._sections[name]
+
+    def _build_schema(self):
+        df = self.df
+        cols = df.columns
+
+        return {
+            "record_types": (
+                df.groupby("record_type", observed=True).size().rename("Count")
+                if "record_type" in cols else None
+            ),
+            "pillars": (
+                df["pillar"].value_counts().rename("Count")
+                if "pillar" in cols else None
+            ),
+        }
+
+    def _build_temporal(self):
+        df = self.df
+        cols = df.columns
+
+        if "observation_date" not in cols or "record_type" not in cols:
+            return None
+
+        record_type = df["record_type"]
+        obs_dates = df.loc[record_type == "observation", "observation_date"]
+        events = df[record_type == "event"]
+
+        return {
+            "obs_range": (obs_dates.min(), obs_dates.max()) if not obs_dates.empty else None,
+            "event_count": len(events),
+            "events": (
+                events[["indicator", "observation_date"]].sort_values("observation_date")
+                if "indicator" in cols and not events.empty else None
+            ),
+        }
+
+    def _build_coverage(self):
+        df = self.df
+
+        if not {"indicator", "value_numeric", "observation_date"}.issubset(df.columns):
+            return None
+
+        # One dict spec so each column's reductions share a pass per group
+        coverage = df.groupby("indicator", sort=False, observed=True).agg({
+            "value_numeric": ["count", "mean", "min", "max"],
+            "observation_date": ["min", "max"],
+        })
+        coverage.columns = ["count", "mean", "min", "max", "first_date", "last_date"]
+        return coverage
+
+    def _build_missing(self):
+        df = self.df
+
+        # count() reads non-null counts per block, no frame-sized mask needed
+        n = len(df)
+        null_count = n - df.count()
+        null_percent = null_count / n * 100
+        return {
+            "quality": pd.DataFrame({"Missing": null_count, "Percent (%)": null_percent}),
+            "confidence": (
+                df["confidence"].value_counts().rename("Count")
+                if "confidence" in df.columns else None
+            ),
+        }
+
+    def _build_impact(self):
+        if (
+            self.impact_df is None
+            or self.impact_df.empty
+            or not {"related_indicator", "impact_direction"}.issubset(self.impact_df.columns)
+        ):
+            return None
+
+        return self.impact_df.groupby(
+            ["related_indicator", "impact_direction"]
+        ).size().unstack(fill_value=0)
+
     # --------------------------------------------------------
     # 1. Schema Overview
     # --------------------------------------------------------
@@ -57,17 +163,18 @@ class InclusionDataProfiler:
             print("\n====== SCHEMA & RECORD TYPE SUMMARY ======")
             logging.info("Running schema overview...")
 
-            if "record_type" not in self.df.columns:
+            schema = self._section("schema")
+
+            if schema["record_types"] is None:
                 raise KeyError("Missing required column: record_type")
 
-            summary = self.df.groupby("record_type").size().to_frame("Count")
-            display(summary)
+            display(schema["record_types"])
 
             print("\n--- Pillar Distribution ---")
-            if "pillar" not in self.df.columns:
+            if schema["pillars"] is None:
                 raise KeyError("Missing required column: pillar")
 
-            display(self.df["pillar"].value_counts().to_frame("Count"))
+            display(schema["pillars"])
 
         except Exception as e:
             logging.error(f"Schema overview failed: {e}")
@@ -88,26 +195,23 @@ class InclusionDataProfiler:
             if "observation_date" not in self.df.columns:
                 raise KeyError("Missing required column: observation_date")
 
-            obs = self.df[self.df["record_type"] == "observation"]
+            if "record_type" not in self.df.columns:
+                raise KeyError("Missing required column: record_type")
+
+            temporal = self._section("temporal")
 
-            if not obs.empty:
-                min_date = obs["observation_date"].min()
-                max_date = obs["observation_date"].max()
+            if temporal["obs_range"] is not None:
+                min_date, max_date = temporal["obs_range"]
 
                 print(f"Observations Range: {min_date.date()} → {max_date.date()}")
                 logging.info(f"Observation range: {min_date} to {max_date}")
 
             # Events section
-            events = self.df[self.df["record_type"] == "event"]
-            print(f"Total Events Cataloged: {len(events)}")
-            logging.info(f"Total Events Cataloged: {len(events)}")
+            print(f"Total Events Cataloged: {temporal['event_count']}")
+            logging.info(f"Total Events Cataloged: {temporal['event_count']}")
 
-            if not events.empty:
-                if "indicator" in events.columns:
-                    display(
-                        events[["indicator", "observation_date"]]
-                        .sort_values("observation_date")
-                    )
+            if temporal["events"] is not None:
+                display(temporal["events"])
 
         except Exception as e:
             logging.error(f"Temporal analysis failed: {e}")
@@ -130,16 +234,7 @@ class InclusionDataProfiler:
                 if col not in self.df.columns:
                     raise KeyError(f"Missing required column: {col}")
 
-            coverage = self.df.groupby("indicator").agg(
-                count=("value_numeric", "count"),
-                mean=("value_numeric", "mean"),
-                min=("value_numeric", "min"),
-                max=("value_numeric", "max"),
-                first_date=("observation_date", "min"),
-                last_date=("observation_date", "max"),
-            )
-
-            display(coverage)
+            display(self._section("coverage"))
 
         except Exception as e:
             logging.error(f"Indicator coverage failed: {e}")
@@ -157,19 +252,15 @@ class InclusionDataProfiler:
             print("\n====== DATA QUALITY (NULLS & CONFIDENCE) ======")
             logging.info("Running missing value + confidence profiling...")
 
-            null_count = self.df.isnull().sum()
-            null_percent = (null_count / len(self.df)) * 100
-
-            quality_df = pd.DataFrame(
-                {"Missing": null_count, "Percent (%)": null_percent}
-            )
+            missing = self._section("missing")
+            quality_df = missing["quality"]
 
             display(quality_df[quality_df["Missing"] > 0])
 
             # Confidence distribution
-            if "confidence" in self.df.columns:
+            if missing["confidence"] is not None:
                 print("\n--- Confidence Level Distribution ---")
-                display(self.df["confidence"].value_counts().to_frame("Count"))
+                display(missing["confidence"])
             else:
                 print("⚠️ Confidence column not found in dataset.")
 
@@ -202,11 +293,7 @@ class InclusionDataProfiler:
             print("\n====== IMPACT LINK RELATIONSHIPS ======")
             print(f"Total Relationships Captured: {len(self.impact_df)}")
 
-            display(
-                self.impact_df.groupby(
-                    ["related_indicator", "impact_direction"]
-                ).size().unstack(fill_value=0)
-            )
+            display(self._section("impact"))
 
             logging.info("Impact link review completed successfully.")
 
@@ -219,7 +306,8 @@ class InclusionDataProfiler:
     # --------------------------------------------------------
     def run_all(self):
         """
-        Executes all profiling modules sequentially.
+        Executes all profiling modules sequentially and returns the
+        computed summaries; a summary that failed to build is None.
         """
 
         try:
@@ -235,6 +323,11 @@ class InclusionDataProfiler:
             print("\n✅ Profiling Completed Successfully.")
             logging.info("Full profiling suite completed successfully.")
 
+            return SimpleNamespace(**{
+                name: self._sections.get(name)
+                for name in ("schema", "temporal", "coverage", "missing", "impact")
+            })
+
         except Exception as e:
             logging.error(f"Run-all profiling failed: {e}")
             print(f"❌ Profiling Execution Error: {e}")
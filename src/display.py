@@ -0,0 +1,11 @@
+def display(obj):
+    """
+    Shows obj with IPython's display in notebooks, or prints it elsewhere.
+    IPython is imported on first use, so plain scripts never load it.
+    """
+    try:
+        from IPython.display import display as ipython_display
+    except ImportError:
+        ipython_display = print
+
+    ipython_display(obj)
@@ -1,8 +1,18 @@
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from .logging_config import logging 
+from .categoricals import CATEGORICAL_COLUMNS, to_categoricals
+
+
+# Columns of the unified sheet the EDA methods read
+EDA_COLUMNS = [
+    "record_type", "pillar", "source_type", "confidence", "indicator", "indicator_code",
+    "value_numeric", "observation_date", "fiscal_year", "gender",
+    "related_indicator", "impact_direction",
+]
 
 
 class EdaAnalysis:
@@ -10,15 +20,23 @@ class EdaAnalysis:
     Task 2: Exploratory Data Analysis for Ethiopia Financial Inclusion Forecasting
     """
 
-    def __init__(self, filepath_or_df, sheet_name=None):
+    def __init__(self, filepath_or_df, sheet_name=None, plots=True, cache=False):
         """
         Initialize with either:
         - A pandas DataFrame (existing workflow), or
         - A path to an Excel file (new workflow) with optional sheet_name.
+
+        With plots=False the plot_* methods skip drawing and only return
+        the data they would have plotted (for batch/headless runs).
+
+        With cache=True an Excel sheet is read through a Parquet copy kept
+        next to the workbook (see read_sheet).
         """
+        self._plots = plots
+
         # If a string is passed, treat it as Excel file path
         if isinstance(filepath_or_df, str):
-            self.df = pd.read_excel(filepath_or_df, sheet_name=sheet_name)
+            self.df = self.read_sheet(filepath_or_df, sheet_name, cache=cache)
         else:
             # Assume it's a DataFrame
             self.df = filepath_or_df.copy()
@@ -27,7 +45,7 @@ class EdaAnalysis:
         # Safe datetime conversion
         # -----------------------------
         self.df["observation_date"] = pd.to_datetime(
-            self.df["observation_date"], errors="coerce"
+            self.df["observation_date"], errors="coerce", format="ISO8601", cache=True
         )
 
         # -----------------------------
@@ -38,13 +56,60 @@ class EdaAnalysis:
         if "fiscal_year" in self.df.columns:
             self.df["year"] = self.df["year"].fillna(self.df["fiscal_year"])
 
-        self.df["year"] = pd.to_numeric(self.df["year"], errors="coerce")
+        # Nullable int16 covers every survey year at a quarter of int64's size
+        self.df["year"] = pd.to_numeric(self.df["year"], errors="coerce").astype("Int16")
+
+        self.df = to_categoricals(self.df)
+
+        # Cached record_type partitions of self.df, keyed by id(self.df)
+        self._record_frames = None
+        self._record_frames_key = None
 
         print("EDA Class Initialized Successfully")
         logging.info("EDA Class Initialized Successfully")
 
 
 
+    @staticmethod
+    def read_sheet(path, sheet_name=None, cache=False):
+        """
+        Reads the EDA columns of one workbook sheet. With cache=True it goes
+        through a Parquet copy kept next to the workbook and rebuilt
+        whenever the workbook is newer; otherwise nothing is written.
+        """
+        sheet = sheet_name if sheet_name is not None else 0
+        cache_path = f"{os.path.splitext(path)[0]}.{sheet}.eda.parquet"
+
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return pd.read_parquet(cache_path, engine="pyarrow")
+
+        dtypes = {col: "category" for col in CATEGORICAL_COLUMNS if col in EDA_COLUMNS}
+        df = pd.read_excel(path, sheet_name=sheet, engine="openpyxl",
+                           usecols=lambda c: c in EDA_COLUMNS, dtype=dtypes)
+
+        if not cache:
+            return df
+
+        # Excel columns mixing numbers and text can't be written by pyarrow
+        mixed = df.select_dtypes(include="object").columns
+        df[mixed] = df[mixed].astype("string")
+
+        df.to_parquet(cache_path, engine="pyarrow", compression="zstd", index=False)
+        logging.info(f"Cached sheet {sheet} of {path} to {cache_path}")
+
+        return df
+
+    def _records(self, record_type):
+        """
+        Rows of self.df with the given record_type. The frame is split by
+        record_type once and the parts are reused until self.df is replaced.
+        """
+        if self._record_frames is None or self._record_frames_key != id(self.df):
+            self._record_frames = dict(tuple(self.df.groupby("record_type", sort=False, observed=True)))
+            self._record_frames_key = id(self.df)
+
+        return self._record_frames.get(record_type, self.df.iloc[0:0])
+
     # ==========================================================
     # TASK 2.1 Dataset Overview
     # ==========================================================
@@ -58,14 +123,15 @@ class EdaAnalysis:
         source_summary = self.df['source_type'].value_counts()
     
         # Plot confidence distribution
-        plt.figure(figsize=(7, 4))
-        sns.countplot(data=self.df, x="confidence")
-        plt.title("Confidence Level Distribution")
-        plt.xlabel("Confidence")
-        plt.ylabel("Count")
-        plt.grid(axis="y", alpha=0.3)
-        plt.tight_layout()
-        plt.show()
+        if self._plots:
+            plt.figure(figsize=(7, 4))
+            sns.countplot(data=self.df, x="confidence")
+            plt.title("Confidence Level Distribution")
+            plt.xlabel("Confidence")
+            plt.ylabel("Count")
+            plt.grid(axis="y", alpha=0.3)
+            plt.tight_layout()
+            plt.show()
 
         return record_summary, pillar_summary, source_summary
 
@@ -75,16 +141,20 @@ class EdaAnalysis:
     # ==========================================================
     def plot_temporal_coverage(self):
 
-        obs_df = self.df[self.df["record_type"] == "observation"].copy()
+        obs_df = self._records("observation")
 
         obs_df = obs_df.dropna(subset=["indicator_code", "year"])
 
-        pivot = obs_df.pivot_table(
-            index="indicator_code",
-            columns="year",
-            values="value_numeric",
-            aggfunc="count"
-        ).fillna(0)
+        # Observations per indicator and year, counted over integer group ids
+        pivot = (
+            obs_df.dropna(subset=["value_numeric"])
+            .groupby(["indicator_code", "year"], observed=True)
+            .size()
+            .unstack(fill_value=0)
+        )
+
+        if not self._plots:
+            return pivot
 
         plt.figure(figsize=(10, 10))
 
@@ -103,12 +173,14 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
+        return pivot
+
     # ==========================================================
     # TASK 2.2 Access + Gender Gap Analysis
     # ==========================================================
     def plot_access_and_gender(self):
 
-        acc = self.df[self.df["indicator_code"] == "ACC_OWNERSHIP"].copy()
+        acc = self.df[self.df["indicator_code"] == "ACC_OWNERSHIP"]
 
         if acc.empty:
             print("ACC_OWNERSHIP data not available.")
@@ -117,10 +189,16 @@ class EdaAnalysis:
         acc = acc.dropna(subset=["year", "value_numeric"])
         acc = acc.sort_values("year")
 
+        # Split by gender in one pass; plotted in a fixed order below
+        by_gender = dict(tuple(acc.groupby("gender", sort=False, observed=True)))
+
+        if not self._plots:
+            return acc
+
         plt.figure(figsize=(10, 5))
 
         # National trend
-        nat = acc[acc["gender"] == "all"]
+        nat = by_gender.get("all", acc.iloc[0:0])
         plt.plot(
             nat["year"],
             nat["value_numeric"],
@@ -131,8 +209,8 @@ class EdaAnalysis:
 
         # Gender disaggregation
         for g in ["male", "female"]:
-            gdata = acc[acc["gender"] == g]
-            if not gdata.empty:
+            gdata = by_gender.get(g)
+            if gdata is not None:
                 plt.plot(
                     gdata["year"],
                     gdata["value_numeric"],
@@ -149,32 +227,39 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
+        return acc
+
     # ==========================================================
     # Growth Rate Between Survey Years
     # ==========================================================
     def plot_growth_rates(self):
 
-        acc = self.df[self.df["indicator_code"] == "ACC_OWNERSHIP"].copy()
+        acc = self.df[self.df["indicator_code"] == "ACC_OWNERSHIP"]
         acc = acc[(acc["gender"] == "all")].dropna(subset=["year", "value_numeric"])
 
         acc = acc.sort_values("year")
 
-        acc["growth_pp"] = acc["value_numeric"].diff()
+        acc = acc.assign(growth_pp=acc["value_numeric"].diff())
 
-        plt.figure(figsize=(8, 4))
-        plt.bar(acc["year"], acc["growth_pp"])
+        if self._plots:
+            plt.figure(figsize=(8, 4))
+            plt.bar(acc["year"], acc["growth_pp"])
 
-        plt.title("Growth Rate in Account Ownership (pp change)")
-        plt.xlabel("Year")
-        plt.ylabel("Growth (percentage points)")
-        plt.grid(axis="y", alpha=0.3)
-        plt.tight_layout()
-        plt.show()
+            plt.title("Growth Rate in Account Ownership (pp change)")
+            plt.xlabel("Year")
+            plt.ylabel("Growth (percentage points)")
+            plt.grid(axis="y", alpha=0.3)
+            plt.tight_layout()
+            plt.show()
+
+        growth_table = acc[["year", "value_numeric", "growth_pp"]]
 
         print("\nGrowth Table:\n")
-        print(acc[["year", "value_numeric", "growth_pp"]])
+        print(growth_table)
         logging.info("Growth Table")
         logging.info("[year, value_numeric, growth_pp]")
+
+        return growth_table
         
 
     # ==========================================================
@@ -184,7 +269,7 @@ class EdaAnalysis:
 
         usage_codes = ["ACC_MM_ACCOUNT", "USG_MM_ACTIVE", "USG_DIGITAL_PAYMENT"]
 
-        usage = self.df[self.df["indicator_code"].isin(usage_codes)].copy()
+        usage = self.df[self.df["indicator_code"].isin(usage_codes)]
 
         if usage.empty:
             print("Usage indicators not found.")
@@ -192,6 +277,10 @@ class EdaAnalysis:
 
         usage = usage.dropna(subset=["year", "value_numeric"])
         usage = usage.sort_values("year")
+        usage = usage.assign(indicator_code=usage["indicator_code"].cat.remove_unused_categories())
+
+        if not self._plots:
+            return usage
 
         plt.figure(figsize=(10, 5))
 
@@ -208,6 +297,8 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
+        return usage
+
     
 
     # ==========================================================
@@ -215,24 +306,24 @@ class EdaAnalysis:
     # ==========================================================
     def plot_event_timeline(self):
 
-        events = self.df[self.df["record_type"] == "event"].copy()
-        events = events.dropna(subset=["observation_date"])
+        events = self._records("event").dropna(subset=["observation_date"])
 
         if events.empty:
             print("No events available.")
             return
 
-        events["year"] = events["observation_date"].dt.year
+        if not self._plots:
+            return events
 
         plt.figure(figsize=(12, 4))
 
         plt.scatter(events["year"], np.ones(len(events)), s=120)
 
-        for _, row in events.iterrows():
+        for year, label in zip(events["year"].to_numpy(), events["indicator"].to_numpy()):
             plt.text(
-                row["year"],
+                year,
                 1.05,
-                row["indicator"],
+                label,
                 rotation=45,
                 ha="right",
                 fontsize=8
@@ -245,6 +336,8 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
+        return events
+
     # ==========================================================
     # Event Overlay on Indicator Trend
     # ==========================================================
@@ -261,6 +354,9 @@ class EdaAnalysis:
             print("No trend data found.")
             return
 
+        if not self._plots:
+            return trend
+
         plt.figure(figsize=(12, 6))
 
         plt.plot(
@@ -272,14 +368,14 @@ class EdaAnalysis:
         )
 
         # Overlay events
-        events = self.df[self.df["record_type"] == "event"].dropna(
+        events = self._records("event").dropna(
             subset=["observation_date"]
         )
 
-        for _, row in events.iterrows():
-            yr = row["observation_date"].year
-
-            plt.axvline(x=yr, linestyle="--", alpha=0.5)
+        # One LineCollection for all events, spanning the axes height like axvline
+        ax = plt.gca()
+        ax.vlines(events["year"].to_numpy(), 0, 1, transform=ax.get_xaxis_transform(),
+                  linestyles="--", alpha=0.5)
 
         plt.title("Account Ownership with Event Overlay")
         plt.xlabel("Year")
@@ -289,39 +385,47 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
+        return trend
+
     # ==========================================================
     # Impact Link Summary
     # ==========================================================
     def summarize_impact_links(self):
 
-        links = self.df[self.df["record_type"] == "impact_link"]
+        links = self._records("impact_link")
 
         if links.empty:
             print("No impact links found.")
             return
 
+        # Same indicator x direction table as InclusionDataProfiler's impact review
         summary = links.groupby(
-            ["related_indicator", "impact_direction"]
-        ).size().reset_index(name="count")
+            ["related_indicator", "impact_direction"], sort=False, observed=True
+        ).size().unstack(fill_value=0)
 
         print("\n--- Impact Link Summary ---\n")
         print(summary)
         logging.info("Impact Link Summary")
         logging.info("Summary")
+
+        return summary
 # ==========================================================
     # TASK 2.4 Correlation Matrix (Clean, Squared, Readable)
     # ==========================================================
     def get_key_correlations(self, threshold=0.5):
-        obs = self.df[self.df["record_type"] == "observation"]
-        pivot = obs.pivot_table(
-            index="year",
-            columns="indicator_code",
-            values="value_numeric",
-            aggfunc="mean"
+        obs = self._records("observation")
+        # Mean per year and indicator over integer group ids
+        pivot = (
+            obs.groupby(["year", "indicator_code"], observed=True)["value_numeric"]
+            .mean()
+            .unstack()
         ).dropna(axis=1, how='all') # Remove empty columns to reduce clutter
 
         corr = pivot.corr()
 
+        if not self._plots:
+            return corr
+
         # Increase figure size so labels have room to breathe
         plt.figure(figsize=(14, 12))
 
@@ -348,4 +452,5 @@ class EdaAnalysis:
         plt.tight_layout()
         plt.show()
 
-        
\ No newline at end of file
+        
+        return corr
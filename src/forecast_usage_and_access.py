@@ -1,8 +1,19 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from IPython.display import display
+from .categoricals import to_categoricals
+from .display import display
+
+
+# Longest history plotted with per-point markers
+MAX_MARKED_POINTS = 200
+
+# Columns the model reads from each input; the rest are not copied
+OBS_COLUMNS = ["observation_date", "indicator_code", "value_numeric", "gender"]
+EVENT_COLUMNS = ["record_id", "observation_date"]
+LINK_COLUMNS = [
+    "parent_id", "related_indicator", "impact_estimate", "lag_months",
+    "confidence", "evidence_basis",
+]
 
 
 class ForecastAccessAndUsage:
@@ -21,16 +32,38 @@ class ForecastAccessAndUsage:
     def __init__(self, observations_df, events_df, impact_links_df, indicators_metadata,
                  forecast_years=None):
 
-        self.obs = observations_df.copy()
-        self.events = events_df.copy()
-        self.links = impact_links_df.copy()
+        # filter() returns new frames holding only the columns used below
+        self.obs = observations_df.filter(items=OBS_COLUMNS)
+        self.events = events_df.filter(items=EVENT_COLUMNS)
+        self.links = impact_links_df.filter(items=LINK_COLUMNS)
 
         self.indicators = indicators_metadata
         self.forecast_years = forecast_years or [2025, 2026, 2027]
 
         # Ensure datetime conversion
-        self.obs["observation_date"] = pd.to_datetime(self.obs["observation_date"])
-        self.events["observation_date"] = pd.to_datetime(self.events["observation_date"])
+        self.obs["observation_date"] = pd.to_datetime(
+            self.obs["observation_date"], format="ISO8601", cache=True
+        )
+        self.events["observation_date"] = pd.to_datetime(
+            self.events["observation_date"], format="ISO8601", cache=True
+        )
+
+        self.obs = to_categoricals(self.obs)
+        self.events = to_categoricals(self.events)
+        self.links = to_categoricals(self.links)
+
+        # National-total (gender='all') history per indicator, in date order
+        national = self.obs[self.obs["gender"] == "all"] if "gender" in self.obs.columns else self.obs
+        self._national = national.sort_values("observation_date")
+        self._obs_by_ind = {
+            code: group
+            for code, group in self._national.groupby(
+                "indicator_code", sort=False, observed=True
+            )
+        }
+
+        # Event date by record_id (first event with that id)
+        self._event_date = self.events.drop_duplicates("record_id").set_index("record_id")["observation_date"]
 
         # Outputs
         self.baseline_forecasts = {}
@@ -44,28 +77,26 @@ class ForecastAccessAndUsage:
         """
         Baseline linear regression forecast using only National Total (gender='all')
         """
-        # 1. Initial filter for the indicator
-        hist = self.obs[self.obs["indicator_code"] == indicator_code].copy()
+        # 1-2. National-total history for the indicator; male/female rows are
+        # left out to remove the vertical 'stack' (e.g. REC_0004, REC_0005)
+        hist = self._obs_by_ind.get(indicator_code)
+        if hist is not None:
+            hist = hist.dropna(subset=["value_numeric"])
+        if hist is None or hist.empty:
+            raise ValueError(f"No history found for {indicator_code}")
     
-        # 2. THE FIX: Filter out male/female rows to remove the vertical 'stack'
-        # This ensures rows like REC_0004 and REC_0005 are ignored
-        if 'gender' in hist.columns:
-            hist = hist[hist['gender'] == 'all']
+        # 3-4. Prepare for Regression
+        x = hist["observation_date"].dt.year.to_numpy(dtype=np.float64)
+        y = hist["value_numeric"].to_numpy(dtype=np.float64)
     
-        # 3. Handle the year extraction
-        # Using .dt.year is good, but we ensure it handles the 2024 'all' string properly
-        hist["year"] = pd.to_datetime(hist["observation_date"]).dt.year
-        
-        # 4. Prepare for Regression
-        X = hist["year"].values.reshape(-1, 1)
-        y = hist["value_numeric"].values
-    
-        # 5. Fit and Predict
-        model = LinearRegression()
-        model.fit(X, y)
+        # 5. Fit and Predict: closed-form least squares for a single regressor
+        # (a flat trend when every point falls in one year, as sklearn gave)
+        x_mean, y_mean = x.mean(), y.mean()
+        sxx = ((x - x_mean) ** 2).sum()
+        slope = ((x - x_mean) * (y - y_mean)).sum() / sxx if sxx else 0.0
+        intercept = y_mean - slope * x_mean
     
-        future_X = np.array(self.forecast_years).reshape(-1, 1)
-        pred = model.predict(future_X)
+        pred = slope * np.asarray(self.forecast_years, dtype=np.float64) + intercept
     
         df = pd.DataFrame({
             "year": self.forecast_years,
@@ -76,6 +107,47 @@ class ForecastAccessAndUsage:
         self.baseline_forecasts[indicator_code] = df
         return df
 
+    def fit_baseline_all(self):
+        """
+        Baseline forecasts for every indicator in one pass: the same linear
+        trend as fit_baseline, solved from per-indicator sums. Fills
+        baseline_forecasts and returns the forecasts indexed by
+        (indicator_code, year); indicators without numeric history are
+        left out.
+        """
+        hist = self._national.dropna(subset=["value_numeric"])
+        x = hist["observation_date"].dt.year.astype(np.float64)
+        y = hist["value_numeric"].astype(np.float64)
+
+        sums = pd.DataFrame({"n": 1.0, "x": x, "y": y, "xx": x * x, "xy": x * y}).groupby(
+            hist["indicator_code"], sort=False, observed=True
+        ).sum()
+
+        n = sums["n"]
+        sxx = sums["xx"] - sums["x"] ** 2 / n
+        sxy = sums["xy"] - sums["x"] * sums["y"] / n
+
+        # Flat trend when every point of an indicator falls in one year
+        slope = (sxy / sxx.where(sxx > 0)).fillna(0.0)
+        intercept = (sums["y"] - slope * sums["x"]) / n
+
+        years = np.asarray(self.forecast_years, dtype=np.float64)
+        pred = slope.to_numpy()[:, None] * years + intercept.to_numpy()[:, None]
+
+        for code, baseline in zip(sums.index, pred):
+            self.baseline_forecasts[code] = pd.DataFrame({
+                "year": self.forecast_years,
+                "indicator_code": code,
+                "baseline": baseline
+            })
+
+        return pd.DataFrame(
+            {"baseline": pred.ravel()},
+            index=pd.MultiIndex.from_product(
+                [sums.index, self.forecast_years], names=["indicator_code", "year"]
+            )
+        )
+
     # =====================================================
     # 2. Event-Augmented Forecast (No ImpactModel Needed)
     # =====================================================
@@ -89,34 +161,25 @@ class ForecastAccessAndUsage:
 
         baseline = self.baseline_forecasts[indicator_code].copy()
 
-        impacts = []
-
         # Filter links relevant to this indicator
         relevant_links = self.links[self.links["related_indicator"] == indicator_code]
 
-        for _, link in relevant_links.iterrows():
-
-            event_id = link["parent_id"]
-            impact = link["impact_estimate"]
-            lag_months = link["lag_months"]
+        # Event date of each link
+        event_date = pd.to_datetime(relevant_links["parent_id"].map(self._event_date))
 
-            # Find event date
-            event_row = self.events[self.events["record_id"] == event_id]
+        # Year the effect starts: event year plus whole years of lag
+        event_year = (
+            event_date.dt.year + np.trunc(relevant_links["lag_months"] / 12)
+        ).to_numpy(dtype=np.float64)
+        impact = relevant_links["impact_estimate"].to_numpy(dtype=np.float64)
 
-            if event_row.empty:
-                continue
-
-            event_date = event_row.iloc[0]["observation_date"]
-            event_year = event_date.year + int(lag_months / 12)
-
-            # Apply effect only after lag
-            for year in self.forecast_years:
-                if year >= event_year:
-                    impacts.append((year, impact))
-
-        # Aggregate yearly impacts
-        impact_df = pd.DataFrame(impacts, columns=["year", "event_effect"])
-        impact_sum = impact_df.groupby("year")["event_effect"].sum().reset_index()
+        # Apply effect only after lag: (links x forecast years) grid, summed per year
+        years = np.asarray(self.forecast_years)
+        active = years[None, :] >= event_year[:, None]
+        impact_sum = pd.DataFrame({
+            "year": years,
+            "event_effect": np.nansum(np.where(active, impact[:, None], 0.0), axis=0),
+        })
 
         merged = baseline.merge(impact_sum, on="year", how="left")
         merged["event_effect"] = merged["event_effect"].fillna(0)
@@ -130,18 +193,24 @@ class ForecastAccessAndUsage:
     # 3. Scenario Forecasts
     # =====================================================
     def generate_scenarios(self, indicator_code):
-    
-        base = self.fit_baseline(indicator_code)
-        with_events = self.fit_event_augmented(indicator_code)
-    
-        optimistic = with_events.copy()
-        optimistic["forecast"] = optimistic["baseline"] + optimistic["event_effect"] * 1.2
-    
-        pessimistic = with_events.copy()
-        pessimistic["forecast"] = pessimistic["baseline"] + pessimistic["event_effect"] * 0.6
-    
-        optimistic["forecast"] = optimistic["forecast"].clip(0, 100)
-        pessimistic["forecast"] = pessimistic["forecast"].clip(0, 100)
+
+        # Scenarios, baseline and event forecasts are reused once computed
+        if indicator_code in self.scenario_forecasts:
+            return self.scenario_forecasts[indicator_code]
+
+        base = self.baseline_forecasts.get(indicator_code)
+        if base is None:
+            base = self.fit_baseline(indicator_code)
+
+        with_events = self.event_forecasts.get(indicator_code)
+        if with_events is None:
+            with_events = self.fit_event_augmented(indicator_code)
+
+        baseline = with_events["baseline"].to_numpy()
+        event_effect = with_events["event_effect"].to_numpy()
+
+        optimistic = with_events.assign(forecast=np.clip(baseline + event_effect * 1.2, 0, 100))
+        pessimistic = with_events.assign(forecast=np.clip(baseline + event_effect * 0.6, 0, 100))
     
         self.scenario_forecasts[indicator_code] = {
             "baseline": base,
@@ -158,32 +227,39 @@ class ForecastAccessAndUsage:
     # =====================================================
     # 4. Plot Forecasts (Corrected for Gender Stacking)
     # =====================================================
-    def plot_forecasts(self, indicator_code):
+    def plot_forecasts(self, indicator_code, ax=None, show=True, savepath=None):
         """
         Visualizes historical data (filtered for 'all' gender) 
         alongside various forecast scenarios.
+
+        Draws on ``ax`` when given (otherwise on a new figure), saves to
+        ``savepath`` if set, and returns the figure. With show=False the
+        figure is not shown; a figure created here is closed after saving.
         """
         if indicator_code not in self.scenario_forecasts:
             raise ValueError(f"Run generate_scenarios('{indicator_code}') first")
+
+        # Imported here so the dashboard never pays for matplotlib
+        import matplotlib.pyplot as plt
+
+        if ax is None:
+            # Constrained layout keeps labels unclipped without tight_layout
+            fig, ax = plt.subplots(figsize=(12, 6), layout="constrained")
+            owns_fig = True
+        else:
+            fig = ax.figure
+            owns_fig = False
     
-        plt.figure(figsize=(12, 6))
-    
-        # --- 1. Filter and Prepare Historical Data ---
-        hist = self.obs[self.obs["indicator_code"] == indicator_code].copy()
-        
-        # Filter for 'all' to remove the vertical gender stack in 2021
-        if 'gender' in hist.columns:
-            hist = hist[hist['gender'] == 'all']
-            
-        # Ensure chronological order so the line doesn't zig-zag
-        hist = hist.sort_values("observation_date")
-        hist["year"] = hist["observation_date"].dt.year
+        # --- 1. Historical Data ---
+        # National total only (no vertical gender stack in 2021), already in
+        # chronological order so the line doesn't zig-zag
+        hist = self._obs_by_ind.get(indicator_code, self.obs.iloc[0:0])
     
-        # Plot clean historical line
-        plt.plot(
-            hist["year"],
+        # Plot clean historical line (markers only while they stay readable)
+        ax.plot(
+            hist["observation_date"].dt.year,
             hist["value_numeric"],
-            marker="o",
+            marker="o" if len(hist) <= MAX_MARKED_POINTS else None,
             label="Historical (National Total)",
             linewidth=3,
             color="#1f77b4" # Strong blue
@@ -206,7 +282,7 @@ class ForecastAccessAndUsage:
             # Use 'forecast' column if it exists, otherwise use 'baseline'
             y_values = df["forecast"] if "forecast" in df.columns else df["baseline"]
     
-            plt.plot(
+            ax.plot(
                 df["year"],
                 y_values,
                 marker="o",
@@ -217,40 +293,52 @@ class ForecastAccessAndUsage:
             )
     
         # --- 3. Formatting ---
-        plt.title(f"Forecast for {indicator_code} (Cleaned Trend)", fontsize=14)
-        plt.xlabel("Year", fontsize=12)
-        plt.ylabel("% Adults", fontsize=12)
-        plt.ylim(0, 100) # Percentages usually look better 0-100
-        plt.grid(True, linestyle=":", alpha=0.6)
-        plt.legend(loc="upper left")
-        
-        # Tight layout helps prevent label clipping
-        plt.tight_layout()
-        plt.show()
+        ax.set_title(f"Forecast for {indicator_code} (Cleaned Trend)", fontsize=14)
+        ax.set_xlabel("Year", fontsize=12)
+        ax.set_ylabel("% Adults", fontsize=12)
+        ax.set_ylim(0, 100) # Percentages usually look better 0-100
+        ax.grid(True, linestyle=":", alpha=0.6)
+        ax.legend(loc="upper left")
+
+        if savepath:
+            fig.savefig(savepath, dpi=120)
+
+        if show:
+            plt.show()
+        elif owns_fig:
+            plt.close(fig)
+
+        return fig
 
     # =====================================================
     # 5. Explain Contributions
     # =====================================================
-    def explain_contributions(self, indicator_code):
+    def explain_contributions(self, indicator_code, show=True):
 
         links = self.links[self.links["related_indicator"] == indicator_code]
 
         if links.empty:
-            print("No event impacts found.")
+            if show:
+                print("No event impacts found.")
             return
 
-        display(links[[
+        contributions = links[[
             "parent_id",
             "impact_estimate",
             "lag_months",
             "confidence",
             "evidence_basis"
-        ]])
+        ]]
+
+        if show:
+            display(contributions)
+
+        return contributions
 
     # =====================================================
     # 6. Forecast Summary Table
     # =====================================================
-    def forecast_summary(self, year, indicator_code):
+    def forecast_summary(self, year, indicator_code, show=True):
         """
         Compare forecasts across scenarios for a given year
         """
@@ -275,6 +363,8 @@ class ForecastAccessAndUsage:
                 })
     
         summary_df = pd.DataFrame(summary)
-        display(summary_df)
+
+        if show:
+            display(summary_df)
         return summary_df
     
\ No newline at end of file
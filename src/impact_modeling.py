@@ -1,6 +1,20 @@
 import pandas as pd
 import numpy as np
-from IPython.display import display
+from .categoricals import to_categoricals
+from .display import display
+from .logging_config import logging
+
+
+# Categorical columns matched against lower-case labels
+LOWERCASE_COLUMNS = ("record_type", "evidence_basis", "impact_direction", "impact_magnitude")
+
+
+def _day_numbers(dates):
+    """Whole days since 1970-01-01 as float64, NaN for missing dates."""
+    days = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+    numbers = days.astype(np.int64).astype(np.float64)
+    numbers[np.isnat(days)] = np.nan
+    return numbers
 
 # Inside the class ImpactModel:
 
@@ -25,6 +39,28 @@ class ImpactModel:
 
         self._align_schema()
 
+        # Parsed once here; generate_matrix and validate_event reuse it
+        if 'observation_date' in self.data.columns:
+            raw_dates = self.data['observation_date']
+            parsed = pd.to_datetime(raw_dates, errors="coerce", format="ISO8601", cache=True)
+            unparsed = int((parsed.isna() & raw_dates.notna()).sum())
+            if unparsed:
+                logging.warning(f"{unparsed} observation_date values are not ISO 8601 dates; set to NaT.")
+            self.data['observation_date'] = parsed
+
+        # Lower-cased once here, so later filters are plain category compares
+        self.data = to_categoricals(self.data, lowercase=LOWERCASE_COLUMNS)
+        self.links = to_categoricals(self.links, lowercase=LOWERCASE_COLUMNS)
+
+        # Observations per indicator, in date order
+        observations = self.data[self.data['record_type'] == 'observation']
+        self._obs_by_ind = {
+            code: group
+            for code, group in observations.sort_values("observation_date").groupby(
+                'indicator_code', sort=False, observed=True
+            )
+        }
+
         self.matrix = None
         self.full_map = None
 
@@ -49,10 +85,14 @@ class ImpactModel:
     def generate_matrix(self):
         """
         Builds Event–Indicator Association Matrix using 'impact_estimate' as main value.
+        The matrix is built once and reused; call reset() to rebuild it.
         """
+        if self.matrix is not None:
+            return self.matrix
+
         # Extract event rows
-        events = self.data[self.data['record_type'].str.lower() == 'event'].copy()
-        events['event_date'] = pd.to_datetime(events['observation_date'])
+        events = self.data[self.data['record_type'] == 'event'].copy()
+        events['event_date'] = events['observation_date']
 
         # Merge links with event metadata
         full_map = self.links.merge(
@@ -62,45 +102,58 @@ class ImpactModel:
             how="left"
         )
 
-        # Evidence weighting (empirical/literature/theoretical)
+        # Evidence weighting (empirical/literature/theoretical); without any
+        # evidence basis every link gets the default weight
+        has_evidence = 'evidence_basis' in full_map.columns and full_map['evidence_basis'].notna().any()
         evidence_weights = {"empirical": 1.0, "literature": 0.7, "theoretical": 0.4}
-        full_map['evidence_weight'] = full_map['evidence_basis'].map(evidence_weights).fillna(0.5)
+        if has_evidence:
+            full_map['evidence_weight'] = full_map['evidence_basis'].map(evidence_weights).astype(float).fillna(0.5)
+        else:
+            full_map['evidence_weight'] = 0.5
 
         # Magnitude fallback mapping
         mag_map = {"high": 0.8, "medium": 0.5, "low": 0.2}
 
-        def calculate_weight(row):
-            estimate = row.get("impact_estimate", 0)
-            if pd.isna(estimate) or estimate == 0:
-                val = mag_map.get(str(row.get("impact_magnitude")).lower(), 0.1)
-            else:
-                val = float(estimate)
-            direction = str(row.get("impact_direction", "increase")).lower()
-            multiplier = -1 if "dec" in direction or "neg" in direction else 1
-            return val * multiplier * row["evidence_weight"]
+        def column(name, default):
+            if name in full_map.columns:
+                return full_map[name]
+            return pd.Series(default, index=full_map.index)
 
-        full_map["weight"] = full_map.apply(calculate_weight, axis=1)
+        # Estimate where given and non-zero, otherwise the magnitude fallback
+        estimate = pd.to_numeric(column("impact_estimate", 0), errors="coerce")
+        fallback = column("impact_magnitude", None).astype(str).map(mag_map).fillna(0.1)
+        val = estimate.where(estimate.notna() & (estimate != 0), fallback)
 
-        # Confidence labeling
-        def confidence_label(evidence):
-            if evidence == "empirical": return "High Confidence"
-            if evidence == "literature": return "Medium Confidence"
-            return "Low Confidence"
+        direction = column("impact_direction", "increase").astype(str)
+        multiplier = np.where(direction.str.contains("dec|neg"), -1.0, 1.0)
+
+        full_map["weight"] = val.to_numpy() * multiplier * full_map["evidence_weight"].to_numpy()
 
-        full_map['confidence_level'] = full_map['evidence_basis'].apply(confidence_label)
+        # Confidence labeling
+        confidence_labels = {"empirical": "High Confidence", "literature": "Medium Confidence"}
+        if has_evidence:
+            full_map['confidence_level'] = (
+                full_map['evidence_basis'].map(confidence_labels).astype(object).fillna("Low Confidence")
+            )
+        else:
+            full_map['confidence_level'] = "Low Confidence"
 
         self.full_map = full_map
 
         # Pivot → Event–Indicator Matrix
-        self.matrix = full_map.pivot_table(
-            index='parent_id',
-            columns='related_indicator',
-            values='weight',
-            aggfunc='sum'
-        ).fillna(0.0)
+        self.matrix = (
+            full_map.groupby(['parent_id', 'related_indicator'], observed=True, sort=False)['weight']
+            .sum()
+            .unstack(fill_value=0.0)
+        )
 
         return self.matrix
 
+    def reset(self):
+        """Drops the cached matrix so the next generate_matrix() rebuilds it."""
+        self.matrix = None
+        self.full_map = None
+
     # ------------------------------------------------------------------
     # 3. Lag + Gradual Adoption Dynamics
     # ------------------------------------------------------------------
@@ -108,18 +161,35 @@ class ImpactModel:
         """
         Gradual adoption curve:
         Effect(t) = impact * (1 - exp(-k * (t - lag)))
+
+        Arguments broadcast, so one call can evaluate every event over the
+        whole timeline. Scalar arguments give a scalar result.
         """
-        if t_months < lag:
-            return 0
-        return impact * (1 - np.exp(-k * (t_months - lag)))
+        # asarray makes scalar inputs writable 0-d arrays for the in-place
+        # steps below; dt[()] unwraps them to scalars again on return
+        dt = np.asarray(np.subtract(t_months, lag, dtype=np.float64))
+        started = dt >= 0
+
+        # Branchless: the clipped argument makes -expm1 exactly 0 before the
+        # lag, and the mask zeroes those lanes without a where. Each step
+        # writes into dt, so the (events x months) grid has no temporaries.
+        np.maximum(dt, 0, out=dt)
+        np.multiply(dt, -k, out=dt)
+        np.expm1(dt, out=dt)
+        np.negative(dt, out=dt)
+        np.multiply(dt, impact, out=dt)
+        np.multiply(dt, started, out=dt)
+        return dt[()]
 
 
     # ------------------------------------------------------------------
     # 4. Forecast Indicator Trajectory
     # ------------------------------------------------------------------
-    def simulate_indicator(self, indicator_code, start="2021-01-01", end="2027-12-31", show=True):
+    def simulate_indicator(self, indicator_code, start="2021-01-01", end="2027-12-31", show=True,
+                           keep_per_event=False):
         """
         Returns forecast DataFrame for a given indicator and optionally displays it.
+        With keep_per_event=True it also holds one effect column per event.
         """
         if self.full_map is None:
             raise ValueError("Run generate_matrix() first.")
@@ -128,12 +198,9 @@ class ImpactModel:
         forecast = pd.DataFrame({"date": timeline})
 
         # Baseline observations
-        obs = self.data[
-            (self.data['record_type'] == 'observation') &
-            (self.data['indicator_code'] == indicator_code)
-        ].sort_values("observation_date")
+        obs = self._obs_by_ind.get(indicator_code)
 
-        if obs.empty:
+        if obs is None:
             raise ValueError(f"No baseline found for {indicator_code}")
 
         baseline_value = obs['value_numeric'].iloc[0]
@@ -142,19 +209,25 @@ class ImpactModel:
         # Relevant impacts
         relevant = self.full_map[self.full_map['related_indicator'] == indicator_code]
 
-        # Apply lagged impacts
-        for _, row in relevant.iterrows():
-            event_date = row['event_date']
-            impact     = row['weight']
-            lag        = row.get('lag_months', 0)
+        # Apply lagged impacts: one (events x months) grid of elapsed months
+        event_dates = relevant['event_date'].to_numpy(dtype="datetime64[ns]")
+        impacts     = relevant['weight'].to_numpy(dtype=np.float64)
+        lags        = (
+            relevant['lag_months'].to_numpy(dtype=np.float64)
+            if 'lag_months' in relevant.columns else np.zeros(len(relevant))
+        )
 
-            forecast[row['parent_id']] = forecast['date'].apply(
-                lambda d: self.event_effect((d - event_date).days / 30, impact, lag)
-            )
+        # Dates become integer day numbers once; the grid is then plain
+        # subtraction instead of timedelta arithmetic
+        elapsed_days = _day_numbers(timeline)[None, :] - _day_numbers(event_dates)[:, None]
+        effects = self.event_effect(elapsed_days / 30, impacts[:, None], lags[:, None])
+
+        if keep_per_event:
+            for parent_id, effect in zip(relevant['parent_id'], effects):
+                forecast[parent_id] = effect
 
-        # Combine multi-event effects
-        event_cols = list(relevant['parent_id'])
-        forecast['total_event_effect'] = forecast[event_cols].sum(axis=1)
+        # Combine multi-event effects (missing event dates contribute nothing)
+        forecast['total_event_effect'] = np.nansum(effects, axis=0)
         forecast['predicted'] = forecast['baseline'] + forecast['total_event_effect']
 
         if show:
@@ -169,14 +242,15 @@ class ImpactModel:
         """
         Returns a validation summary dict and optionally displays as a table.
         """
-        obs = self.data[
-            (self.data['record_type'] == 'observation') &
-            (self.data['indicator_code'] == indicator_code)
-        ]
-        obs['year'] = pd.to_datetime(obs['observation_date']).dt.year
-
-        v_start = obs[obs['year'] == year_start]['value_numeric'].mean()
-        v_end   = obs[obs['year'] == year_end]['value_numeric'].mean()
+        obs = self._obs_by_ind.get(indicator_code, self.data.iloc[0:0])
+
+        # Mean observed value per year, in one grouped pass
+        year_mean = obs.groupby(
+            obs['observation_date'].dt.year
+        )['value_numeric'].mean()
+
+        v_start = year_mean.get(year_start, np.nan)
+        v_end   = year_mean.get(year_end, np.nan)
         observed_change = v_end - v_start
 
         forecast = self.simulate_indicator(indicator_code, show=False)
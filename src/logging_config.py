@@ -1,5 +1,8 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 # Ensure a logs folder exists
 LOG_DIR = os.path.join(os.path.dirname(__file__), "../logs")
@@ -7,20 +10,32 @@ os.makedirs(LOG_DIR, exist_ok=True)
 
 LOG_FILE = os.path.join(LOG_DIR, "logging.log")
 
-# Configure logging
-logging.basicConfig(
-    filename=LOG_FILE,
-    filemode="a",                  # Append mode
-    level=logging.INFO,            # Capture INFO, WARNING, ERROR
-    format="%(asctime)s - %(levelname)s - %(message)s",
+formatter = logging.Formatter(
+    "%(asctime)s - %(levelname)s - %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
-# Optional: also log to console
+# File handler (append mode) and console handler
+file_handler = logging.FileHandler(LOG_FILE, mode="a")
+file_handler.setFormatter(formatter)
+
 console = logging.StreamHandler()
 console.setLevel(logging.INFO)
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
 console.setFormatter(formatter)
-logging.getLogger("").addHandler(console)
+
+# Callers only enqueue records; a background listener does the writes
+log_queue = queue.SimpleQueue()
+listener = QueueListener(log_queue, file_handler, console, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+root = logging.getLogger("")
+root.setLevel(logging.INFO)        # Capture INFO, WARNING, ERROR
+root.addHandler(QueueHandler(log_queue))
+
+# The format never uses thread/process fields, so don't collect them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 
 logging.info("Logging Initialized")